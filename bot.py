@@ -15,12 +15,16 @@ from config import (
     API_TOKEN, WELCOME_MSG, CODE_ADDED_SUCCESS, CODE_ALREADY_EXISTS, NO_CODES_AVAILABLE,
     RATE_LIMIT_EXCEEDED, NOT_AUTHORIZED, CONFIRM_USAGE_PROMPT, ACTION_CANCELLED, REFERRAL_CODE_MSG,
     CODE_NOT_FOUND, CODE_DELETED_SUCCESS, INVALID_OR_DUPLICATE_CODE, USED_BUTTON_TEXT, CONFIRM_BUTTON_TEXT,
-    CANCEL_BUTTON_TEXT
+    CANCEL_BUTTON_TEXT, ADMIN_IDS, MAX_PROFILED_UPDATES, PROFILE_USAGE, PROFILE_STARTED, PROFILE_ALREADY_RUNNING,
+    PROFILE_STOPPED, PROFILE_NOT_RUNNING
 )
 from database import (
     add_code, get_codes, delete_code, increment_code_usage, code_exists, can_get_code,
     log_user_activity, can_add_code, fetch_referral_code_by_id
 )
+from profiling import (
+    ProfilingMiddleware, PROFILING_MODES, start_profiling, stop_profiling, format_handler_timings
+)
 
 # Constants
 CODE_REGEX = r'^[a-zA-Z0-9]+$'  # Only allows alphanumeric characters
@@ -29,6 +33,9 @@ CODE_REGEX = r'^[a-zA-Z0-9]+$'  # Only allows alphanumeric characters
 bot = Bot(token=API_TOKEN)
 dp = Dispatcher(bot)
 
+# Record handler timings and drive on-demand profiling windows
+dp.middleware.setup(ProfilingMiddleware())
+
 # Set up logging
 log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
 log_handler = RotatingFileHandler('bot.log', maxBytes=5*1024*1024, backupCount=3)  # 5MB per log file, 3 backup logs
@@ -38,6 +45,9 @@ logger = logging.getLogger()
 logger.addHandler(log_handler)
 logger.setLevel(logging.INFO)
 
+# Keep references to pending deletion tasks so they aren't garbage-collected before they run
+deletion_tasks = set()
+
 
 @dp.message_handler(commands=['start'])
 async def start_command(message: types.Message):
@@ -190,8 +200,11 @@ async def send_referral_code(message: types.Message):
                 # Log the user's activity
                 log_user_activity(user_id, 'get', code[1])
 
-                # Schedule the sent message for deletion after 1 hour
-                await schedule_message_deletion(message.chat.id, sent_message.message_id, 1 * 60 * 60)
+                # Schedule the sent message for deletion after 1 hour without blocking the handler
+                task = asyncio.create_task(
+                    schedule_message_deletion(message.chat.id, sent_message.message_id, 1 * 60 * 60))
+                deletion_tasks.add(task)
+                task.add_done_callback(deletion_tasks.discard)
             else:
                 # If the selected code's usage is above the threshold, delete it and send a new one to the user
                 logger.debug(f"Referral code {code[1]} exceeded usage limit. Deleting and retrying.")
@@ -359,6 +372,67 @@ async def list_codes_command(message: types.Message):
         logger.warning(f"No codes found in the database.")
 
 
+@dp.message_handler(commands=['profile'])
+async def profile_command(message: types.Message):
+    """
+    Handler for the admin-only /profile command. Enables cProfile (`cprofile`) or event-loop
+    slow-callback tracing (`loop`) for the next N updates and sends the summary back to this chat.
+    `/profile stop` closes the active window early and reports what it has collected.
+
+    Args:
+        message (types.Message): The incoming Telegram message object.
+    """
+
+    # Log the receipt of the /profile command
+    logger.info(f"/profile command received from {message.from_user.id} with arguments {message.get_args()}")
+
+    # Only admins are allowed to profile the bot
+    if message.from_user.id not in ADMIN_IDS:
+        logger.warning(f"Unauthorized /profile attempt by user {message.from_user.id}")
+        await message.reply(NOT_AUTHORIZED)
+        return
+
+    args = message.get_args().split()
+
+    # Stop the active profiling window on request
+    if args == ['stop']:
+        await message.reply(PROFILE_STOPPED if stop_profiling() else PROFILE_NOT_RUNNING)
+        return
+
+    # Validate the requested mode and the number of updates to profile
+    if len(args) != 2 or args[0] not in PROFILING_MODES or not args[1].isdecimal() \
+            or not 1 <= int(args[1]) <= MAX_PROFILED_UPDATES:
+        await message.reply(PROFILE_USAGE.format(MAX_PROFILED_UPDATES))
+        return
+
+    mode, updates = args[0], int(args[1])
+    if start_profiling(mode, updates, message.chat.id):
+        await message.reply(PROFILE_STARTED.format(mode, updates))
+    else:
+        await message.reply(PROFILE_ALREADY_RUNNING)
+
+
+@dp.message_handler(commands=['timings'])
+async def timings_command(message: types.Message):
+    """
+    Handler for the admin-only /timings command. Dumps the per-handler timing ring buffer.
+
+    Args:
+        message (types.Message): The incoming Telegram message object.
+    """
+
+    # Log the receipt of the /timings command
+    logger.info(f"/timings command received from {message.from_user.id}")
+
+    # Only admins are allowed to inspect handler timings
+    if message.from_user.id not in ADMIN_IDS:
+        logger.warning(f"Unauthorized /timings attempt by user {message.from_user.id}")
+        await message.reply(NOT_AUTHORIZED)
+        return
+
+    await message.answer(format_handler_timings())
+
+
 if __name__ == '__main__':
     """
     Main execution block. If this script is run directly (not imported),
@@ -8,6 +8,17 @@ load_dotenv()
 API_TOKEN = os.getenv('API_TOKEN')
 DB_NAME = 'referral_codes.db'
 
+# Comma-separated Telegram user IDs allowed to use the admin-only commands
+ADMIN_IDS = [int(user_id) for user_id in os.getenv('ADMIN_IDS', '').split(',') if user_id.strip()]
+
+# Profiling settings
+TIMINGS_BUFFER_SIZE = 1000  # Number of most recent handler timings kept in memory
+TIMINGS_RECENT_ENTRIES = 20  # Number of most recent handler timings listed individually by /timings
+PROFILE_TOP_FUNCTIONS = 20  # Number of functions listed in a cProfile summary
+SLOW_CALLBACK_THRESHOLD = 0.1  # Seconds a callback may block the event loop before being reported
+MAX_PROFILED_UPDATES = 1000  # Upper bound for the number of updates a single profiling window may cover
+MAX_PROFILE_SECONDS = 600  # Profiling windows are stopped and reported after this many seconds at most
+
 # General Bot Responses
 WELCOME_MSG = "Привет! Отправь мне свой реферальный код командой /add. Используй /povo, чтобы получить случайный " \
               "реферальный код."
@@ -24,6 +35,19 @@ CODE_NOT_FOUND = "Реферальный код не найден."
 CODE_DELETED_SUCCESS = "Реферальный код успешно удален!"
 INVALID_OR_DUPLICATE_CODE = "Реферальный код недействителен или уже был добавлен ранее"
 
+# Admin Profiling Responses
+PROFILE_USAGE = "Использование: /profile <cprofile|loop> <количество обновлений, 1-{}> или /profile stop"
+PROFILE_STARTED = "Профилирование ({}) запущено для следующих {} обновлений."
+PROFILE_ALREADY_RUNNING = "Профилирование уже запущено. Дождитесь его завершения или используйте /profile stop."
+PROFILE_STOPPED = "Профилирование остановлено, результаты будут отправлены в чат."
+PROFILE_NOT_RUNNING = "Профилирование не запущено."
+PROFILE_SUMMARY_HEADER = "Результаты cProfile за {} обновлений (bot.py, database.py):\n"
+SLOW_CALLBACKS_SUMMARY_HEADER = "Медленные колбэки за {} обновлений (порог {} с):\n"
+NO_SLOW_CALLBACKS = "За {} обновлений медленных колбэков (порог {} с) не обнаружено."
+TIMINGS_SUMMARY_HEADER = "Время обработчиков (последние {} вызовов, с {} по {}):\n"
+RECENT_TIMINGS_HEADER = "\nПоследние вызовы:\n"
+NO_TIMINGS_RECORDED = "Данные о времени обработчиков пока отсутствуют."
+
 # Inline Keyboard Buttons (keeping these the same as they contain universal symbols)
 USED_BUTTON_TEXT = "Я использовал(а) код ✅"
 CONFIRM_BUTTON_TEXT = "Да ✅"
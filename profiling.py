@@ -0,0 +1,310 @@
+# Standard library imports
+import io
+import time
+import asyncio
+import logging
+import cProfile
+import pstats
+from contextvars import ContextVar
+from datetime import datetime
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# Third-party package imports
+from aiogram import Bot, types
+from aiogram.dispatcher.handler import current_handler
+from aiogram.dispatcher.middlewares import BaseMiddleware
+
+# Local application imports
+from config import (
+    TIMINGS_BUFFER_SIZE, PROFILE_TOP_FUNCTIONS, SLOW_CALLBACK_THRESHOLD, MAX_PROFILE_SECONDS, PROFILE_SUMMARY_HEADER,
+    SLOW_CALLBACKS_SUMMARY_HEADER, NO_SLOW_CALLBACKS, NO_TIMINGS_RECORDED, TIMINGS_SUMMARY_HEADER,
+    TIMINGS_RECENT_ENTRIES, RECENT_TIMINGS_HEADER
+)
+
+# Configure logging for the profiling module
+log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+log_handler = RotatingFileHandler('profiling.log', maxBytes=5*1024*1024, backupCount=3)  # 5MB per log file, 3 backup logs
+log_handler.setFormatter(log_formatter)
+
+logger = logging.getLogger('profiling')
+logger.addHandler(log_handler)
+logger.setLevel(logging.INFO)
+
+# Format used for timestamps in the /timings dump
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# Telegram rejects messages longer than 4096 characters
+MAX_MESSAGE_LENGTH = 4000
+
+# Supported modes of an on-demand profiling window
+MODE_CPROFILE = 'cprofile'
+MODE_SLOW_CALLBACKS = 'loop'
+PROFILING_MODES = (MODE_CPROFILE, MODE_SLOW_CALLBACKS)
+
+# Only the bot's own modules are listed in a cProfile summary, otherwise the event loop's
+# idle time waiting on the long-poll pushes the handlers and database calls out of the top rows
+PROFILED_MODULES_PATTERN = r'^(bot|database)\.py:'
+
+# Always-on ring buffer of (finished_at, handler_name, duration, failed) tuples
+handler_timings = deque(maxlen=TIMINGS_BUFFER_SIZE)
+
+# (handler_name, profiling_window, started_at) of the handler running in the current update, if any.
+# Kept in a context variable rather than the handler data, because the error hook gets a fresh data dict.
+current_timing = ContextVar('current_timing', default=None)
+
+# The currently running profiling window, if any
+active_window = None
+
+# Keep references to pending report tasks so they aren't garbage-collected before they run
+report_tasks = set()
+
+
+class SlowCallbackCollector(logging.Handler):
+    """
+    Logging handler that collects the "Executing <Handle> took X seconds" warnings
+    asyncio emits in debug mode for callbacks exceeding `slow_callback_duration`.
+    """
+
+    def __init__(self):
+        super().__init__(level=logging.WARNING)
+        self.messages = []
+
+    def emit(self, record: logging.LogRecord):
+        message = record.getMessage()
+        if message.startswith('Executing '):
+            self.messages.append(message)
+
+
+class ProfilingWindow:
+    """
+    A profiling session that stays active for the next N updates (or until it is stopped or
+    `MAX_PROFILE_SECONDS` elapse) and then reports a summary back to the chat that requested it.
+
+    Args:
+        mode (str): Either `MODE_CPROFILE` or `MODE_SLOW_CALLBACKS`.
+        updates (int): The number of updates to profile.
+        chat_id (int): The ID of the chat the summary should be sent to.
+    """
+
+    def __init__(self, mode: str, updates: int, chat_id: int):
+        self.mode = mode
+        self.remaining = updates
+        self.updates = updates
+        self.chat_id = chat_id
+        self.profiler = None
+        self.collector = None
+        self.previous_debug = None
+        self.previous_slow_callback_duration = None
+        self.deadline_handle = None
+
+    def start(self):
+        """
+        Enable the profiler or the event loop's slow-callback tracing.
+        """
+        if self.mode == MODE_CPROFILE:
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            loop = asyncio.get_event_loop()
+            self.previous_debug = loop.get_debug()
+            self.previous_slow_callback_duration = loop.slow_callback_duration
+            self.collector = SlowCallbackCollector()
+            logging.getLogger('asyncio').addHandler(self.collector)
+            loop.slow_callback_duration = SLOW_CALLBACK_THRESHOLD
+            loop.set_debug(True)
+
+        logger.info(f"Started {self.mode} profiling window for the next {self.updates} updates.")
+
+    def stop(self) -> str:
+        """
+        Disable profiling, restore the event loop settings and build the summary.
+
+        Returns:
+            str: A human-readable summary of the profiling window.
+        """
+        if self.deadline_handle is not None:
+            self.deadline_handle.cancel()
+
+        processed = self.updates - self.remaining
+
+        if self.mode == MODE_CPROFILE:
+            self.profiler.disable()
+            stream = io.StringIO()
+            stats = pstats.Stats(self.profiler, stream=stream)
+            stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE)
+            stats.print_stats(PROFILED_MODULES_PATTERN, PROFILE_TOP_FUNCTIONS)
+            summary = PROFILE_SUMMARY_HEADER.format(processed) + stream.getvalue()
+        else:
+            loop = asyncio.get_event_loop()
+            loop.set_debug(self.previous_debug)
+            loop.slow_callback_duration = self.previous_slow_callback_duration
+            logging.getLogger('asyncio').removeHandler(self.collector)
+
+            if self.collector.messages:
+                summary = SLOW_CALLBACKS_SUMMARY_HEADER.format(processed, SLOW_CALLBACK_THRESHOLD)
+                summary += "\n".join(self.collector.messages)
+            else:
+                summary = NO_SLOW_CALLBACKS.format(processed, SLOW_CALLBACK_THRESHOLD)
+
+        logger.info(f"Finished {self.mode} profiling window after {processed} of {self.updates} updates.")
+        return summary[:MAX_MESSAGE_LENGTH]
+
+
+def start_profiling(mode: str, updates: int, chat_id: int) -> bool:
+    """
+    Start a new profiling window unless one is already running.
+
+    Args:
+        mode (str): Either `MODE_CPROFILE` or `MODE_SLOW_CALLBACKS`.
+        updates (int): The number of updates to profile.
+        chat_id (int): The ID of the chat the summary should be sent to.
+
+    Returns:
+        bool: True if the window was started, False if another one is already active.
+    """
+    global active_window
+
+    if active_window is not None:
+        logger.warning(f"Refused to start {mode} profiling window: another window is already active.")
+        return False
+
+    active_window = ProfilingWindow(mode, updates, chat_id)
+    active_window.start()
+
+    # Make sure profiling never stays enabled indefinitely on a quiet bot
+    active_window.deadline_handle = asyncio.get_event_loop().call_later(MAX_PROFILE_SECONDS, stop_profiling)
+    return True
+
+
+def stop_profiling() -> bool:
+    """
+    Close the active profiling window and report whatever it has collected so far.
+
+    Returns:
+        bool: True if a window was stopped, False if none was active.
+    """
+    global active_window
+
+    if active_window is None:
+        return False
+
+    window = active_window
+    active_window = None
+    schedule_report(window)
+    return True
+
+
+async def report_window(window: ProfilingWindow):
+    """
+    Stop the given profiling window and send its summary to the chat that requested it.
+
+    Args:
+        window (ProfilingWindow): The profiling window to report on.
+    """
+    try:
+        summary = window.stop()
+        await Bot.get_current().send_message(window.chat_id, summary)
+        logger.info(f"Sent {window.mode} profiling summary to chat {window.chat_id}.")
+    except Exception as e:
+        logger.error(f"Failed to report {window.mode} profiling window to chat {window.chat_id}: {e}")
+
+
+def schedule_report(window: ProfilingWindow):
+    """
+    Report on the given profiling window from a separate task, so that asyncio gets to log the
+    current (possibly slow) step before the slow-callback collector is detached.
+
+    Args:
+        window (ProfilingWindow): The profiling window to report on.
+    """
+    task = asyncio.get_event_loop().create_task(report_window(window))
+    report_tasks.add(task)
+    task.add_done_callback(report_tasks.discard)
+
+
+def format_handler_timings() -> str:
+    """
+    Summarise the contents of the handler timing ring buffer.
+
+    Returns:
+        str: The time span the buffer covers, per-handler call count, average, maximum and last duration
+            in milliseconds, followed by the most recent calls with their timestamps.
+    """
+    if not handler_timings:
+        return NO_TIMINGS_RECORDED
+
+    # Group the recorded durations and failure counts by handler name, preserving chronological order
+    durations = {}
+    failures = {}
+    for _, handler_name, duration, failed in handler_timings:
+        durations.setdefault(handler_name, []).append(duration)
+        failures[handler_name] = failures.get(handler_name, 0) + failed
+
+    oldest = datetime.fromtimestamp(handler_timings[0][0]).strftime(TIMESTAMP_FORMAT)
+    newest = datetime.fromtimestamp(handler_timings[-1][0]).strftime(TIMESTAMP_FORMAT)
+    summary = TIMINGS_SUMMARY_HEADER.format(len(handler_timings), oldest, newest)
+    for handler_name, values in sorted(durations.items(), key=lambda item: max(item[1]), reverse=True):
+        summary += (f"{handler_name}: n={len(values)}, avg={sum(values) / len(values) * 1000:.1f}ms, "
+                    f"max={max(values) * 1000:.1f}ms, last={values[-1] * 1000:.1f}ms, "
+                    f"failed={failures[handler_name]}\n")
+
+    # List the most recent calls so slowdowns can be placed in time
+    summary += RECENT_TIMINGS_HEADER
+    for finished_at, handler_name, duration, failed in list(handler_timings)[-TIMINGS_RECENT_ENTRIES:]:
+        timestamp = datetime.fromtimestamp(finished_at).strftime(TIMESTAMP_FORMAT)
+        summary += f"{timestamp} {handler_name}: {duration * 1000:.1f}ms{' [failed]' if failed else ''}\n"
+
+    return summary[:MAX_MESSAGE_LENGTH]
+
+
+class ProfilingMiddleware(BaseMiddleware):
+    """
+    Middleware that records the duration of every handler into the ring buffer and
+    counts down the active profiling window, if any.
+
+    Handlers that raise never reach the post-process stage, so their timing is finished
+    from the error hook instead and tagged as failed.
+    """
+
+    async def _start_timing(self):
+        handler = current_handler.get(None)
+        handler_name = handler.__name__ if handler else 'unknown'
+        current_timing.set((handler_name, active_window, time.perf_counter()))
+
+    async def _finish_timing(self, failed: bool):
+        timing = current_timing.get()
+
+        # Updates that matched no handler never went through the process stage
+        if timing is None:
+            return
+
+        # Clear the timing so it is finished only once, even if the update is followed by an error
+        current_timing.set(None)
+
+        handler_name, window, started_at = timing
+        duration = time.perf_counter() - started_at
+        handler_timings.append((time.time(), handler_name, duration, failed))
+
+        # Only count updates that started after the window was opened
+        if window is None or window is not active_window:
+            return
+
+        window.remaining -= 1
+        if window.remaining <= 0:
+            stop_profiling()
+
+    async def on_process_message(self, message: types.Message, data: dict):
+        await self._start_timing()
+
+    async def on_post_process_message(self, message: types.Message, results: list, data: dict):
+        await self._finish_timing(failed=False)
+
+    async def on_process_callback_query(self, callback_query: types.CallbackQuery, data: dict):
+        await self._start_timing()
+
+    async def on_post_process_callback_query(self, callback_query: types.CallbackQuery, results: list, data: dict):
+        await self._finish_timing(failed=False)
+
+    async def on_pre_process_error(self, update: types.Update, exception: Exception, data: dict):
+        await self._finish_timing(failed=True)